@@ -9,6 +9,8 @@ from jinja2 import Environment, FileSystemLoader, TemplateError
 
 # Import AI functions from the new ai sub-package
 from . import ai as ai_engine
+from .config import SPECULATION_BUDGET
+from .speculation import TemplateSpeculator
 
 
 def mock_generate_image_url(prompt, size):
@@ -29,10 +31,29 @@ def mock_generate_image_url(prompt, size):
     return f"https://via.placeholder.com/{int(width)}x{int(height)}.png?text={text}"
 
 
+BASE_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ site_title or 'AI Generated Website' }}</title>
+    <link rel="stylesheet" href="css/style.css">
+</head>
+<body>
+    {{ website_content|safe }}
+</body>
+</html>"""
+
+
 class WebsiteGenerator:
-    def __init__(self, output_dir="output_website"):
+    def __init__(
+        self, output_dir="output_website", clean=True, speculation_budget=None
+    ):
         self.output_dir = output_dir
-        if os.path.exists(self.output_dir):
+        self.speculation_budget = (
+            SPECULATION_BUDGET if speculation_budget is None else speculation_budget
+        )
+        if clean and os.path.exists(self.output_dir):
             print(
                 f"[BUILDER] 🗑️  Deleting existing output directory '{self.output_dir}'."
             )
@@ -43,14 +64,14 @@ class WebsiteGenerator:
         os.makedirs(self.images_dir, exist_ok=True)
         os.makedirs(os.path.join(self.website_dir, "css"), exist_ok=True)
         print(
-            f"[BUILDER] ✅ Created clean output directory structure at '{self.output_dir}'."
+            f"[BUILDER] ✅ Prepared output directory structure at '{self.output_dir}'."
         )
 
         current_dir = os.path.dirname(os.path.abspath(__file__))
         self.templates_dir = os.path.join(current_dir, "templates")
         self.env = None  # Will be initialized later
 
-    def _render_component(self, section_data):
+    def _render_component(self, section_data, auto_fix=True):
         section_type = section_data.get("type")
         if not section_type:
             return "<!-- Section data is missing a 'type' key. -->"
@@ -60,7 +81,7 @@ class WebsiteGenerator:
         if not os.path.exists(template_path):
             return f"<!-- Template '{template_name}' not found. -->"
 
-        max_retries = 1
+        max_retries = 1 if auto_fix else 0
         for attempt in range(max_retries + 1):
             try:
                 if not self.env:
@@ -95,6 +116,11 @@ class WebsiteGenerator:
                     f"[BUILDER] ⚠️  Attempt {attempt + 1}: Failed to load/render '{template_name}'. Error: {e}"
                 )
 
+                if not auto_fix:
+                    return (
+                        f"<!-- ERROR: Failed to render {section_type} template: {e} -->"
+                    )
+
                 if attempt >= max_retries:
                     print(
                         f"[BUILDER] ❌ Giving up on '{template_name}' after {max_retries + 1} attempts."
@@ -131,6 +157,16 @@ class WebsiteGenerator:
 
         return f"<!-- UNEXPECTED RENDER ERROR for {section_type} -->"
 
+    def _render_page(self, master_plan, website_content):
+        """Renders the full page from the in-memory base template."""
+        if not self.env:
+            self.env = Environment(loader=FileSystemLoader(self.templates_dir))
+        base_template = self.env.from_string(BASE_HTML_TEMPLATE)
+        return base_template.render(
+            site_title=master_plan.get("site_title", "AI Generated Website"),
+            website_content=website_content,
+        )
+
     def _extract_design_specs(self, design_doc_md):
         """Extracts color palette and typography from the design document markdown."""
         print("[BUILDER] 🔍 Extracting design specs from design_document.md...")
@@ -222,66 +258,81 @@ class WebsiteGenerator:
     def generate(self, user_prompt):
         # --- ！！！重大修改！！！ ---
         # 调整了整个生成流程的顺序
-        # 1. 生成 Master Plan
-        master_plan = ai_engine.ai_generate_master_plan(user_prompt)
-        if not master_plan:
-            print("\n[FATAL] Unable to generate master design plan, process aborted.")
-            return
-
-        with open(
-            os.path.join(self.output_dir, "master_plan.json"), "w", encoding="utf-8"
-        ) as f:
-            json.dump(master_plan, f, indent=4, ensure_ascii=False)
-        print("[BUILDER] ✅ master_plan.json saved for debugging.")
-
-        # 2. 基于 Master Plan 生成设计文档
-        design_doc_md = ai_engine.ai_write_design_doc(master_plan)
-        with open(
-            os.path.join(self.output_dir, "design_document.md"), "w", encoding="utf-8"
-        ) as f:
-            f.write(design_doc_md or "# Failed to generate design document.")
-        print(f"[BUILDER] ✅ design_document.md generated.")
+        # 0. 根据历史记录，在生成 Master Plan 的同时预先生成常见模板
+        speculator = TemplateSpeculator(self.speculation_budget)
+        speculator.start(user_prompt)
 
-        # 3. 从设计文档中提取颜色和字体规范
-        design_specs_str = self._extract_design_specs(design_doc_md)
-
-        # 4. 基于 Master Plan 和提取的规范生成 CSS
-        generated_css = ai_engine.ai_generate_css(master_plan, design_specs_str)
-        with open(
-            os.path.join(self.website_dir, "css", "style.css"), "w", encoding="utf-8"
-        ) as f:
-            f.write(generated_css)
-        print(f"[BUILDER] ✅ AI-generated style.css saved.")
-
-        # 5. 生成所有需要的 HTML 模板
-        print("\n[BUILDER] 🔍 Regenerating all required templates...")
-        if os.path.exists(self.templates_dir):
-            shutil.rmtree(self.templates_dir)
-        os.makedirs(self.templates_dir)
-        print("[BUILDER] 🗑️  Cleared old templates.")
-
-        required_section_types = {
-            s.get("type") for s in master_plan.get("sections", []) if s.get("type")
-        }
-        for section_type in required_section_types:
-            example_content = next(
-                (
-                    s.get("content")
-                    for s in master_plan["sections"]
-                    if s.get("type") == section_type
-                ),
-                None,
-            )
-            generated_html = ai_engine.ai_generate_template(
-                section_type, example_content
-            )
-            if generated_html:
-                with open(
-                    os.path.join(self.templates_dir, f"{section_type}.html"),
-                    "w",
-                    encoding="utf-8",
-                ) as f:
-                    f.write(generated_html)
+        master_plan = None
+        try:
+            # 1. 生成 Master Plan
+            master_plan = ai_engine.ai_generate_master_plan(user_prompt)
+            if not master_plan:
+                print(
+                    "\n[FATAL] Unable to generate master design plan, process aborted."
+                )
+                return
+
+            with open(
+                os.path.join(self.output_dir, "master_plan.json"), "w", encoding="utf-8"
+            ) as f:
+                json.dump(master_plan, f, indent=4, ensure_ascii=False)
+            print("[BUILDER] ✅ master_plan.json saved for debugging.")
+
+            # 2. 基于 Master Plan 生成设计文档
+            design_doc_md = ai_engine.ai_write_design_doc(master_plan)
+            with open(
+                os.path.join(self.output_dir, "design_document.md"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(design_doc_md or "# Failed to generate design document.")
+            print(f"[BUILDER] ✅ design_document.md generated.")
+
+            # 3. 从设计文档中提取颜色和字体规范
+            design_specs_str = self._extract_design_specs(design_doc_md)
+
+            # 4. 基于 Master Plan 和提取的规范生成 CSS
+            generated_css = ai_engine.ai_generate_css(master_plan, design_specs_str)
+            with open(
+                os.path.join(self.website_dir, "css", "style.css"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(generated_css)
+            print(f"[BUILDER] ✅ AI-generated style.css saved.")
+
+            # 5. 生成所有需要的 HTML 模板
+            print("\n[BUILDER] 🔍 Regenerating all required templates...")
+            if os.path.exists(self.templates_dir):
+                shutil.rmtree(self.templates_dir)
+            os.makedirs(self.templates_dir)
+            print("[BUILDER] 🗑️  Cleared old templates.")
+
+            required_section_types = {
+                s.get("type") for s in master_plan.get("sections", []) if s.get("type")
+            }
+            for section_type in required_section_types:
+                example_content = next(
+                    (
+                        s.get("content")
+                        for s in master_plan["sections"]
+                        if s.get("type") == section_type
+                    ),
+                    None,
+                )
+                generated_html = speculator.take(
+                    section_type, example_content
+                ) or ai_engine.ai_generate_template(section_type, example_content)
+                if generated_html:
+                    with open(
+                        os.path.join(self.templates_dir, f"{section_type}.html"),
+                        "w",
+                        encoding="utf-8",
+                    ) as f:
+                        f.write(generated_html)
+        finally:
+            # Always cancel leftover speculation; history is only recorded with a plan
+            speculator.finish(user_prompt, master_plan)
 
         self.env = Environment(loader=FileSystemLoader(self.templates_dir))
         print("[BUILDER] 🔄  Reloaded template environment.")
@@ -292,28 +343,7 @@ class WebsiteGenerator:
         for section in master_plan.get("sections", []):
             all_sections_html += self._render_component(section) + "\n"
 
-        base_html_content = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{ site_title or 'AI Generated Website' }}</title>
-    <link rel="stylesheet" href="css/style.css">
-</head>
-<body>
-    {{ website_content|safe }}
-</body>
-</html>"""
-        with open(
-            os.path.join(self.templates_dir, "base.html"), "w", encoding="utf-8"
-        ) as f:
-            f.write(base_html_content)
-
-        base_template = self.env.get_template("base.html")
-        final_html = base_template.render(
-            site_title=master_plan.get("site_title", "AI Generated Website"),
-            website_content=all_sections_html,
-        )
+        final_html = self._render_page(master_plan, all_sections_html)
 
         with open(
             os.path.join(self.website_dir, "index.html"), "w", encoding="utf-8"
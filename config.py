@@ -40,3 +40,13 @@ def configure_api():
 # Define model names to be used across the application
 MODEL_NAME_PRO = "gemini-2.5-flash-preview-04-17"
 MODEL_NAME_FLASH = os.getenv("FLASH_MODEL", "gemini-2.5-flash-preview-04-17")
+
+# Speculative template generation: max number of templates to pre-generate
+# while the master plan is being created (0 disables speculation).
+SPECULATION_BUDGET = int(os.getenv("SPECULATION_BUDGET", "0"))
+# Previous runs (prompts and section schemas) used to predict section types.
+HISTORY_PATH = os.getenv(
+    "GENERATION_HISTORY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "generation_history.json"),
+)
+HISTORY_LIMIT = 50
@@ -0,0 +1,340 @@
+# ai_website_generator/preview.py
+
+import argparse
+import copy
+import json
+import os
+import queue
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from .builder import WebsiteGenerator
+
+EVENTS_PATH = "/__preview/events"
+
+LIVE_RELOAD_SCRIPT = """<script>
+(function () {
+    var source = new EventSource("%s");
+    function findMarkers(index) {
+        var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_COMMENT);
+        var start = null;
+        var node;
+        while ((node = walker.nextNode())) {
+            if (node.nodeValue === "preview-section:" + index) {
+                start = node;
+            } else if (start && node.nodeValue === "/preview-section:" + index) {
+                return [start, node];
+            }
+        }
+        return null;
+    }
+    source.addEventListener("section", function (event) {
+        var data = JSON.parse(event.data);
+        var markers = findMarkers(data.index);
+        if (!markers || markers[0].parentNode !== markers[1].parentNode) {
+            location.reload();
+            return;
+        }
+        var parent = markers[0].parentNode;
+        while (markers[0].nextSibling !== markers[1]) {
+            parent.removeChild(markers[0].nextSibling);
+        }
+        var range = document.createRange();
+        range.setStartAfter(markers[0]);
+        parent.insertBefore(range.createContextualFragment(data.html), markers[1]);
+    });
+    source.addEventListener("css", function () {
+        document.querySelectorAll('link[rel="stylesheet"]').forEach(function (link) {
+            link.href = link.href.split("?")[0] + "?v=" + Date.now();
+        });
+    });
+    source.addEventListener("reload", function () {
+        location.reload();
+    });
+})();
+</script>""" % EVENTS_PATH
+
+
+class PreviewServer:
+    """
+    Serves an already generated website and hot re-renders it on edits.
+
+    Watches master_plan.json, the templates directory and style.css. Only the
+    sections affected by an edit are re-rendered (through the generator's cached
+    Jinja environment) and pushed to connected browsers via Server-Sent Events.
+    No AI calls are made: the AI-Fixer is disabled while previewing.
+    """
+
+    def __init__(
+        self,
+        output_dir="output_website",
+        host="127.0.0.1",
+        port=8000,
+        poll_interval=0.05,
+    ):
+        self.output_dir = output_dir
+        # Created in serve_forever(), once the output is known to exist, so a
+        # wrong output_dir does not leave empty folders behind.
+        self.generator = None
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+
+        self.plan_path = os.path.join(output_dir, "master_plan.json")
+        self.css_path = os.path.join(output_dir, "website", "css", "style.css")
+
+        self.master_plan = {}
+        # One entry per section: {"key": ..., "type": ..., "html": ...}
+        self.sections = []
+        self.page_html = ""
+
+        self._lock = threading.Lock()
+        self._clients = []
+        self._mtimes = {}
+        self._stop = threading.Event()
+
+    # --- Rendering ---
+
+    def _render_section(self, section):
+        # _render_component mutates the content (image URLs), so render a copy
+        # and keep the pristine JSON as the change-detection key.
+        key = json.dumps(section, sort_keys=True, ensure_ascii=False)
+        html = self.generator._render_component(copy.deepcopy(section), auto_fix=False)
+        return {"key": key, "type": section.get("type"), "html": html}
+
+    def _assemble_page(self):
+        # Section boundaries are marked with comments so the DOM (and any
+        # structural CSS selectors) matches the generated index.html.
+        content = "".join(
+            f"<!--preview-section:{i}-->{s['html']}<!--/preview-section:{i}-->\n"
+            for i, s in enumerate(self.sections)
+        )
+        html = self.generator._render_page(self.master_plan, content)
+        self.page_html = html.replace("</body>", LIVE_RELOAD_SCRIPT + "\n</body>", 1)
+
+    def _load_plan(self):
+        try:
+            with open(self.plan_path, "r", encoding="utf-8") as f:
+                plan = json.load(f)
+            if not isinstance(plan, dict):
+                raise ValueError("the plan is not a JSON object")
+            sections = plan.get("sections", [])
+            if not isinstance(sections, list) or not all(
+                isinstance(section, dict) for section in sections
+            ):
+                raise ValueError("'sections' must be a list of objects")
+            return plan
+        except (OSError, ValueError) as e:
+            print(
+                f"[PREVIEW] ⚠️  Could not load master_plan.json, keeping last version: {e}"
+            )
+            return None
+
+    def _apply_changes(self, plan_changed, template_types):
+        """Applies the plan diff, then re-renders every section whose template changed."""
+        layout_changed = False
+        if plan_changed:
+            new_plan = self._load_plan()
+            if new_plan is not None:
+                layout_changed = len(new_plan.get("sections", [])) != len(
+                    self.sections
+                ) or new_plan.get("site_title") != self.master_plan.get("site_title")
+                self.master_plan = new_plan
+
+        new_sections = self.master_plan.get("sections", [])
+        changed = []
+        for i, section in enumerate(new_sections):
+            key = json.dumps(section, sort_keys=True, ensure_ascii=False)
+            if (
+                i < len(self.sections)
+                and self.sections[i]["key"] == key
+                and section.get("type") not in template_types
+            ):
+                continue
+            rendered = self._render_section(section)
+            if i < len(self.sections):
+                self.sections[i] = rendered
+            else:
+                self.sections.append(rendered)
+            changed.append(i)
+        del self.sections[len(new_sections) :]
+
+        if not changed and not layout_changed:
+            return
+        self._assemble_page()
+        if layout_changed:
+            self._broadcast("reload", {})
+        else:
+            for i in changed:
+                self._broadcast(
+                    "section", {"index": i, "html": self.sections[i]["html"]}
+                )
+
+    # --- Watching ---
+
+    def _watched_files(self):
+        files = {self.plan_path: "plan", self.css_path: "css"}
+        if os.path.isdir(self.generator.templates_dir):
+            for name in os.listdir(self.generator.templates_dir):
+                if name.endswith(".html"):
+                    path = os.path.join(self.generator.templates_dir, name)
+                    files[path] = "template"
+        return files
+
+    def _snapshot(self):
+        mtimes = {}
+        for path, kind in self._watched_files().items():
+            try:
+                mtimes[path] = (kind, os.stat(path).st_mtime_ns)
+            except OSError:
+                continue
+        return mtimes
+
+    def _poll_once(self):
+        mtimes = self._snapshot()
+        changed_paths = {
+            path
+            for path in set(mtimes) | set(self._mtimes)
+            if mtimes.get(path) != self._mtimes.get(path)
+        }
+        if not changed_paths:
+            return
+        started = time.perf_counter()
+        changed_kinds = {
+            path: (mtimes.get(path) or self._mtimes.get(path))[0]
+            for path in changed_paths
+        }
+        kinds = set(changed_kinds.values())
+        self._mtimes = mtimes
+
+        template_types = {
+            os.path.splitext(os.path.basename(path))[0]
+            for path, kind in changed_kinds.items()
+            if kind == "template"
+        }
+        with self._lock:
+            if "plan" in kinds or template_types:
+                self._apply_changes("plan" in kinds, template_types)
+            if "css" in kinds:
+                self._broadcast("css", {})
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"[PREVIEW] 🔄 Changes applied ({', '.join(sorted(kinds))}) in {elapsed_ms:.1f}ms."
+        )
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._poll_once()
+            except Exception as e:
+                print(f"[PREVIEW] ❌ Error while applying changes: {e}")
+
+    # --- Server-Sent Events ---
+
+    def _broadcast(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        for client in list(self._clients):
+            client.put(message)
+
+    def _make_handler(self):
+        server = self
+
+        class PreviewRequestHandler(SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(
+                    *args, directory=server.generator.website_dir, **kwargs
+                )
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path in ("/", "/index.html"):
+                    self._send_page()
+                elif path == EVENTS_PATH:
+                    self._stream_events()
+                else:
+                    super().do_GET()
+
+            def _send_page(self):
+                with server._lock:
+                    body = server.page_html.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_events(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                client = queue.Queue()
+                server._clients.append(client)
+                try:
+                    while not server._stop.is_set():
+                        try:
+                            message = client.get(timeout=15)
+                        except queue.Empty:
+                            message = ": keep-alive\n\n"
+                        self.wfile.write(message.encode("utf-8"))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    server._clients.remove(client)
+
+            def log_message(self, format, *args):
+                pass
+
+        return PreviewRequestHandler
+
+    # --- Entry point ---
+
+    def serve_forever(self):
+        if not os.path.exists(self.plan_path):
+            print(
+                f"[PREVIEW] ❌ '{self.plan_path}' not found. Generate a website first."
+            )
+            return
+
+        self.generator = WebsiteGenerator(self.output_dir, clean=False)
+        self._mtimes = self._snapshot()
+        with self._lock:
+            self._apply_changes(True, set())
+            self._assemble_page()
+        print(
+            f"[PREVIEW] ✅ Rendered {len(self.sections)} sections from master_plan.json."
+        )
+
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+
+        httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        httpd.daemon_threads = True
+        print(f"[PREVIEW] 🌐 Serving live preview at http://{self.host}:{self.port}/")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n[PREVIEW] 👋 Stopping preview server.")
+        finally:
+            self._stop.set()
+            httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Live preview for a generated website."
+    )
+    parser.add_argument("--output-dir", default="output_website")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    PreviewServer(args.output_dir, host=args.host, port=args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
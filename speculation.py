@@ -0,0 +1,199 @@
+# ai_website_generator/speculation.py
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from . import ai as ai_engine
+from .config import HISTORY_LIMIT, HISTORY_PATH
+
+_CJK_RUN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+
+
+def _tokenize(text):
+    """Splits a prompt into words; CJK text has no spaces, so it uses character bigrams."""
+    text = str(text).lower()
+    tokens = set(re.findall(r"\w+", _CJK_RUN.sub(" ", text)))
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.add(run)
+        tokens.update(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def content_schema(content):
+    """Reduces section content to its key structure, ignoring the actual values."""
+    if isinstance(content, dict):
+        return {key: content_schema(value) for key, value in content.items()}
+    if isinstance(content, list):
+        return [content_schema(content[0])] if content else []
+    return None
+
+
+class TemplateSpeculator:
+    """
+    Pre-generates HTML templates for likely section types while the master plan
+    is still being generated.
+
+    Predictions come from previous runs stored in the history file: section types
+    are ranked by how often they appeared, weighted by how similar the earlier
+    prompt was. A speculative template is only used if the planned section has
+    the same type and the same content schema; all other results are discarded.
+    """
+
+    def __init__(self, budget, history_path=HISTORY_PATH):
+        self.budget = max(0, budget)
+        self.history_path = history_path
+        self.history = self._load_history()
+        self._executor = None
+        # section_type -> (content_schema, future)
+        self._pending = {}
+        self.speculated = 0
+        self.hits = 0
+
+    def _load_history(self):
+        if not os.path.exists(self.history_path):
+            return []
+        try:
+            with open(self.history_path, "r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[SPECULATION] ⚠️  Could not read history, ignoring it: {e}")
+            return []
+
+        if not isinstance(history, list):
+            print("[SPECULATION] ⚠️  History is not a list, ignoring it.")
+            return []
+        # Skip hand-edited or stale entries rather than failing later on
+        valid = [
+            run
+            for run in history
+            if isinstance(run, dict) and isinstance(run.get("sections"), dict)
+        ]
+        if len(valid) != len(history):
+            print(
+                f"[SPECULATION] ⚠️  Ignoring {len(history) - len(valid)} malformed history entries."
+            )
+        return valid
+
+    def predict(self, user_prompt):
+        """Returns up to `budget` (section_type, example_content) pairs."""
+        prompt_tokens = _tokenize(user_prompt)
+        scores = {}
+        examples = {}
+        for run in self.history:
+            weight = 1 + len(prompt_tokens & _tokenize(run.get("prompt", "")))
+            for section_type, content in run.get("sections", {}).items():
+                scores[section_type] = scores.get(section_type, 0) + weight
+                # Keep the example from the most similar (then most recent) run
+                if weight >= examples.get(section_type, (0, None))[0]:
+                    examples[section_type] = (weight, content)
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[: self.budget]
+        return [(section_type, examples[section_type][1]) for section_type in ranked]
+
+    def start(self, user_prompt):
+        """Starts speculative template generation in the background."""
+        if not self.budget:
+            return
+        try:
+            self._start(user_prompt)
+        except Exception as e:
+            # Speculation is only a speed-up; never let it break generation.
+            print(f"[SPECULATION] ⚠️  Could not start speculation, skipping it: {e}")
+
+    def _start(self, user_prompt):
+        predictions = self.predict(user_prompt)
+        if not predictions:
+            print("[SPECULATION] ℹ️  No history yet, skipping speculative templates.")
+            return
+
+        print(
+            f"[SPECULATION] 🔮 Pre-generating {len(predictions)} templates: "
+            f"{', '.join(t for t, _ in predictions)}"
+        )
+        self.speculated = len(predictions)
+        self._executor = ThreadPoolExecutor(max_workers=len(predictions))
+        for section_type, example_content in predictions:
+            future = self._executor.submit(
+                ai_engine.ai_generate_template, section_type, example_content
+            )
+            self._pending[section_type] = (content_schema(example_content), future)
+
+    def take(self, section_type, example_content):
+        """Returns the speculative template for a planned section if it matches, else None."""
+        pending = self._pending.pop(section_type, None)
+        if not pending:
+            return None
+        schema, future = pending
+        if schema != content_schema(example_content):
+            future.cancel()
+            return None
+
+        generated_html = future.result()
+        if generated_html:
+            self.hits += 1
+            print(
+                f"[SPECULATION] ✅ Reusing speculative template for '{section_type}'."
+            )
+        return generated_html
+
+    def finish(self, user_prompt, master_plan):
+        """Discards unused speculation, reports the hit rate and records this run."""
+        try:
+            return self._finish(user_prompt, master_plan)
+        except Exception as e:
+            print(f"[SPECULATION] ⚠️  Could not finish speculation: {e}")
+            return None
+
+    def _finish(self, user_prompt, master_plan):
+        for _, future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+        if self._executor:
+            # Calls already in flight cannot be aborted; their results are dropped.
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        speculated = self.speculated
+        hit_rate = self.hits / speculated if speculated else None
+        if speculated:
+            print(
+                f"[SPECULATION] 📊 Hit rate: {self.hits}/{speculated} ({hit_rate:.0%})."
+            )
+
+        if master_plan:
+            self._record(user_prompt, master_plan, speculated, hit_rate)
+        return hit_rate
+
+    def _record(self, user_prompt, master_plan, speculated, hit_rate):
+        sections = {}
+        for section in master_plan.get("sections", []):
+            if section.get("type") and section["type"] not in sections:
+                sections[section["type"]] = section.get("content")
+
+        self.history.append(
+            {
+                "prompt": user_prompt,
+                "sections": sections,
+                "speculated": speculated,
+                "hits": self.hits,
+                "hit_rate": hit_rate,
+            }
+        )
+        self.history = self.history[-HISTORY_LIMIT:]
+
+        total_speculated = sum(run.get("speculated", 0) for run in self.history)
+        if total_speculated:
+            total_hits = sum(run.get("hits", 0) for run in self.history)
+            print(
+                f"[SPECULATION] 📈 Overall hit rate over recent runs: "
+                f"{total_hits}/{total_speculated} ({total_hits / total_speculated:.0%})."
+            )
+
+        try:
+            with open(self.history_path, "w", encoding="utf-8") as f:
+                json.dump(self.history, f, indent=4, ensure_ascii=False)
+        except OSError as e:
+            print(f"[SPECULATION] ⚠️  Could not save history: {e}")